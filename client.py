@@ -5,11 +5,13 @@ from utils.logger import clientLog, clientError
 from flask import Flask, request, jsonify
 
 client = Flask(__name__)
+maxJobsPerRequest = 100000  # max jobs the proxy will create for a single /create_jobs call
 
 class VideoTransClient:
 
-    def __init__(self, baseUrl, callbackUrl, clientId=None, pollingInterval=3, maxTimeout=30, autoPoll=True):
+    def __init__(self, baseUrl, callbackUrl, clientId=None, pollingInterval=3, maxTimeout=30, autoPoll=True, batchSize=500):
         self.baseUrl = baseUrl
+        self.batchSize = batchSize      # max jobs sent per /create_jobs call
         self.pollingInterval = pollingInterval
         self.maxTimeout = maxTimeout
         self.jobs = {}
@@ -17,12 +19,27 @@ class VideoTransClient:
         self.autoPoll = autoPoll
         self.callbackUrl = callbackUrl
 
+    # sends a request, waiting out 429s for as long as the server's Retry-After allows within maxTimeout
+    def send(self, method, url, **kwargs):
+        waited = 0
+        while True:
+            response = requests.request(method, url, **kwargs)
+            if response.status_code != 429:
+                return response
+            retryAfter = float(response.headers.get("Retry-After", self.pollingInterval))
+            if waited + retryAfter > self.maxTimeout:
+                clientError(f"Server busy, giving up after {waited}s", self.clientId)
+                return response
+            clientLog(f"Server busy, retrying in {retryAfter}s", self.clientId)
+            time.sleep(retryAfter)
+            waited += retryAfter
+
     def createJob(self, id=None):
         try:
             if id:
-                response = requests.post(f"{self.baseUrl}/create_job/{self.clientId}?jobId={id}")
+                response = self.send("POST", f"{self.baseUrl}/create_job/{self.clientId}?jobId={id}")
             else:
-                response = requests.post(f"{self.baseUrl}/create_job/{self.clientId}")
+                response = self.send("POST", f"{self.baseUrl}/create_job/{self.clientId}")
             clientLog(f"Creating job for client {self.clientId}", self.clientId)
             response.raise_for_status()
             jobData = response.json()
@@ -34,6 +51,39 @@ class VideoTransClient:
             clientError(f"Job creation failed: {err}", self.clientId)
             return {"result": "error", "message": str(err)}
 
+    # creates many jobs using the bulk endpoint, jobs is either a count or a list of job IDs
+    def createJobs(self, jobs):
+        if isinstance(jobs, int) and not isinstance(jobs, bool) and jobs > 0:
+            jobIds = [None] * jobs
+        elif isinstance(jobs, (list, tuple)) and jobs:
+            jobIds = list(jobs)
+        else:
+            clientError(f"Bulk job creation needs a positive count or a list of job IDs, got {jobs!r}", self.clientId)
+            return {"result": "error", "message": "Expected a positive count or a non-empty list of job IDs", "jobIds": []}
+        created = []
+        try:
+            start = 0
+            while start < len(jobIds):   # split into chunks the server accepts
+                chunk = jobIds[start:start + self.batchSize]
+                response = self.send("POST", f"{self.baseUrl}/create_jobs/{self.clientId}", json={"jobIds": chunk})
+                clientLog(f"Creating {len(chunk)} jobs for client {self.clientId}", self.clientId)
+                limits = response.json().get("limits") if response.status_code == 400 else None
+                if limits and len(chunk) > min(limits.values()):
+                    # chunk is bigger than the server's admission limits, shrink it and resend
+                    self.batchSize = min(limits.values())
+                    clientLog(f"Batch size reduced to {self.batchSize} to fit server limits", self.clientId)
+                    continue
+                response.raise_for_status()
+                for jobData in response.json():
+                    jobId = jobData.get("jobId")
+                    self.jobs[jobId] = {"status": "queued", "progress": 0}
+                    created.append(jobId)
+                start += len(chunk)
+            clientLog(f"{len(created)} jobs created", clientId=self.clientId)
+            return {"result": "success", "jobIds": created}
+        except requests.RequestException as err:
+            clientError(f"Bulk job creation failed after {len(created)} jobs: {err}", self.clientId)
+            return {"result": "error", "message": str(err), "jobIds": created}
 
     # get the status of sim either specific or all
     def getStatus(self, jobId=None):
@@ -42,21 +92,23 @@ class VideoTransClient:
                 if jobId not in self.jobs:
                     clientError(f"GetStatus: Job ID {jobId} not found in client records", self.clientId)
                     return {"result": "error", "message": "No job ID found"}
-                response = requests.get(f"{self.baseUrl}/status/{jobId}")
+                response = self.send("GET", f"{self.baseUrl}/status/{jobId}")
             else:
-                response = requests.get(f"{self.baseUrl}/status")
+                response = self.send("GET", f"{self.baseUrl}/status")
             response.raise_for_status()
             statusInfo = response.json()
             if jobId:
                 self.jobs[jobId]["status"] = statusInfo.get("status", "error")
                 self.jobs[jobId]["progress"] = statusInfo.get("progress", 0)
-            clientLog(f"GetStatus: Status fetched for job {jobId}", self.clientId)
-            return {"result": "success", "data": statusInfo}
+            # server's estimate of when the status is worth checking again
+            pollAfter = float(response.headers.get("X-Poll-After", self.pollingInterval))
+            clientLog(f"GetStatus: Status fetched for job {jobId}, poll again in {pollAfter}s", self.clientId)
+            return {"result": "success", "data": statusInfo, "pollAfter": pollAfter}
         except requests.RequestException as err:
             clientError(f"GetStatus: Error during status fetch: {err}", self.clientId)
             return {"result": "error", "message": str(err)}
 
-    # constant polling as described in basic implementation
+    # polls until the job is done, waiting as long as the server's X-Poll-After hint suggests between calls
     def waitForCompletion(self, jobId):
         if jobId not in self.jobs:
             clientError(f"WFC: Job {jobId} not found", self.clientId)
@@ -64,18 +116,18 @@ class VideoTransClient:
         
         startTime = time.time()
         while time.time() - startTime < self.maxTimeout:
-            statusInfo = self.getStatus(jobId)
-            jobStatus = statusInfo.get("status")
-            self.jobs[jobId]["status"] = jobStatus
-            self.jobs[jobId]["progress"] = statusInfo.get("progress", 0)
+            result = self.getStatus(jobId)
+            statusInfo = result.get("data", {})
+            jobStatus = statusInfo.get("status", "").lower()
             if jobStatus == "completed":
                 clientLog(f"WFC: Job {jobId} completed", self.clientId)
-                return {"result": "completed", data: statusInfo}
+                return {"result": "completed", "data": statusInfo}
             elif jobStatus == "error":
                 clientError(f"WFC: Job {jobId} failed", self.clientId)
                 return {"result": "error", "message": "Job failed", "data": statusInfo}
             clientLog(f"WFC: Job {jobId}: {jobStatus}, {statusInfo.get('progress', 0)}%", self.clientId)
-            time.sleep(self.pollingInterval)
+            remaining = self.maxTimeout - (time.time() - startTime)
+            time.sleep(max(0, min(result.get("pollAfter", self.pollingInterval), remaining)))
 
             
         clientError(f"WFC: Job {jobId} timed out", self.clientId)
@@ -183,6 +235,40 @@ def createJobRoute(clientId):
     else:
         return jsonify({"result": "error", "message": "Failed to create job"}), 500
 
+@client.route("/create_jobs/<clientId>", methods=['POST'])
+def createJobsRoute(clientId):
+    clients = get_clients()
+    if clientId not in clients:
+        clientError(f"Client {clientId} not found", clientId)
+        return jsonify({"result": "error", "message": "Client not found"}), 404
+    client = clients[clientId]
+    # either a list of job IDs in the body or a count in the query string
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        clientError("Request body must be a JSON object", clientId)
+        return jsonify({"result": "error", "message": "Request body must be a JSON object with a jobIds list"}), 400
+    if "jobIds" in data:
+        jobs = data["jobIds"]
+        if not isinstance(jobs, list) or not jobs:
+            clientError("jobIds must be a non-empty list", clientId)
+            return jsonify({"result": "error", "message": "jobIds must be a non-empty list"}), 400
+    else:
+        try:
+            jobs = int(request.args.get("count", 1))
+        except ValueError:
+            jobs = 0
+        if jobs <= 0:
+            clientError(f"Invalid job count {request.args.get('count')}", clientId)
+            return jsonify({"result": "error", "message": "count must be a positive integer"}), 400
+    if (jobs if isinstance(jobs, int) else len(jobs)) > maxJobsPerRequest:
+        clientError(f"Request for too many jobs, max is {maxJobsPerRequest}", clientId)
+        return jsonify({"result": "error", "message": f"At most {maxJobsPerRequest} jobs per request"}), 400
+    result = client.createJobs(jobs)
+    if result["result"] == "success":
+        return jsonify(result)
+    else:
+        return jsonify(result), 500
+
 if __name__ == "__main__":
     # client = create_client()
 
@@ -11,6 +11,7 @@ class Job:
         self.status = status   #initial status
         self.clientId = clientId
         self.callbackUrl = callbackUrl        # used by server to send job update on end
+        self.seq = None                        # order the job was put on the queue, set by the server
 
     def start(self):
         self.startTime = time.time()
@@ -1,5 +1,6 @@
 from flask import Flask, jsonify, request, Blueprint
 import time
+import math
 import random
 import uuid
 import requests
@@ -16,7 +17,9 @@ jobQueue = Queue()
 jobs = {}  # {job_id: Job...}
 clientJobs = {} # {client_id: [job1, job2, ...]}
 completedJobs = {} # {client_id:[completed_job1, completed_job2, ...]}
-currJob_Id = 0
+currJobId = None
+enqueuedCount = 0   # jobs ever put on jobQueue, a queued job's position is job.seq - dequeuedCount
+dequeuedCount = 0   # seq after the job the worker last took, set from that job so a reset can't make it drift
 lock = threading.Lock()         # locking so shared resources updated safely, also for future use when multiple servers/clients
 
 # mock config for sim (use to set global delay and error rate for easier debugging)
@@ -26,16 +29,27 @@ defaultConfig = {
 }
 
 testing = True  # use default config for testing
+callbackBaseUrl = "http://localhost:5002"  # callback server that forwards job updates to clients
+maxBatchSize = 1000  # max jobs accepted by a single /create_jobs call
+
+# admission control, jobs past these limits are rejected with 429 and a Retry-After
+admissionConfig = {
+    "maxQueueDepth": 5000,      # max jobs waiting in jobQueue
+    "maxClientJobs": 1000,      # max unfinished jobs per client
+}
+maxPollAfter = 30  # cap on the X-Poll-After hint so estimates don't go too stale
 
 # process next job in queue
 def processJob():
-    global currJobId
+    global currJobId, dequeuedCount
     while True:             # This is so each server processes one job at a time
         try:
             currJobId = jobQueue.get(timeout=1)  # Use thread-safe Queue
         
             with lock:
                 job = jobs.get(currJobId)
+                if job and job.seq is not None:
+                    dequeuedCount = max(dequeuedCount, job.seq + 1)
                 if not job:
                     serverError(f"Job ID {currJobId} not found")
                     currJobId = None
@@ -43,7 +57,7 @@ def processJob():
             job.start()
             serverLog(f"Job {currJobId} started")
 
-            pollRate = max(1, job.delay * 0.1) # Polling rate is 10% of delay
+            pollRate = workerPollRate(job.delay)
 
             while job.status not in ["completed", "error"]:             # Polling loop
                 with lock:
@@ -64,7 +78,7 @@ def processJob():
                 elif job.status == "error":
                     # Reset job and put back in queue
                     job.reset()
-                    jobQueue.put(currJobId)
+                    enqueue(job)
 
             currJobId = None
         except:
@@ -99,18 +113,151 @@ def createJob(clientId=None, jobId=None, callbackUrl=None):
         serverError(f"Job ID {jobId} already exists")
         return jsonify({"error": f"Job ID {jobId} already exists"}), 400
 
-    delay = defaultConfig["delay"] if testing else random.randint(5, 15)
-    errorRate = defaultConfig["errorRate"] if testing else 0.1
-    job = Job(jobId, delay, errorRate, clientId, callbackUrl)   # Create job object
+    job = newJob(jobId, clientId, callbackUrl)   # Create job object
 
     # update data structures
-    jobs[jobId] = job
-    jobQueue.put(jobId)
-    clientJobs.setdefault(clientId, []).append(job)  
+    with lock:
+        if jobId in jobs:  # re-check under lock in case of a concurrent create
+            serverError(f"Job ID {jobId} already exists")
+            return jsonify({"error": f"Job ID {jobId} already exists"}), 400
+        rejected = admit(clientId, 1)
+        if rejected:
+            return rejected
+        jobs[jobId] = job
+        enqueue(job)
+        clientJobs.setdefault(clientId, []).append(job)
 
     serverLog(f"Created job ID: {jobId} for client ID: {clientId}")
     return jsonify(job.toDict())
 
+# creates many simulation jobs at once, either all jobs are queued or none are
+def createJobs(clientId=None, jobIds=None, callbackUrl=None):
+    if not clientId:
+        serverError("Client ID required")
+        return jsonify({"error": "Client ID required"}), 400
+    if not isinstance(jobIds, list) or not jobIds:
+        serverError("A non-empty list of job IDs is required")
+        return jsonify({"error": "A non-empty list of job IDs is required"}), 400
+    if len(jobIds) > maxBatchSize:
+        serverError(f"Batch of {len(jobIds)} jobs exceeds max batch size {maxBatchSize}")
+        return jsonify({"error": f"Batch size exceeds max of {maxBatchSize}", "limits": {"maxBatchSize": maxBatchSize}}), 400
+
+    if any(jobId is not None and (not isinstance(jobId, str) or not jobId) for jobId in jobIds):
+        serverError("Job IDs must be non-empty strings or null")
+        return jsonify({"error": "Job IDs must be non-empty strings or null"}), 400
+
+    jobIds = [jobId if jobId is not None else str(uuid.uuid4()) for jobId in jobIds]  # None means generate an ID
+    if len(set(jobIds)) != len(jobIds):
+        serverError("Duplicate job IDs in batch")
+        return jsonify({"error": "Duplicate job IDs in batch"}), 400
+
+    newJobs = [newJob(jobId, clientId, callbackUrl) for jobId in jobIds]
+
+    # update data structures for the whole batch in one critical section
+    with lock:
+        existing = [jobId for jobId in jobIds if jobId in jobs]
+        if existing:
+            serverError(f"Job IDs already exist: {existing}")
+            return jsonify({"error": "Job IDs already exist", "jobIds": existing}), 400
+        rejected = admit(clientId, len(newJobs))
+        if rejected:
+            return rejected
+        for job in newJobs:
+            jobs[job.jobId] = job
+            enqueue(job)
+        clientJobs.setdefault(clientId, []).extend(newJobs)
+
+    serverLog(f"Created {len(newJobs)} jobs for client ID: {clientId}")
+    return jsonify([job.toDict() for job in newJobs])
+
+# builds a job with the current sim config
+def newJob(jobId, clientId, callbackUrl):
+    delay = defaultConfig["delay"] if testing else random.randint(5, 15)
+    errorRate = defaultConfig["errorRate"] if testing else 0.1
+    return Job(jobId, delay, errorRate, clientId, callbackUrl)
+
+# checks if numJobs more jobs fit in the queue and client limits, returns a 429 response if not (call with lock held)
+def admit(clientId, numJobs):
+    if numJobs > min(admissionConfig.values()):  # would never be admitted, so retrying is pointless
+        serverError(f"Batch of {numJobs} jobs exceeds admission limits {admissionConfig}")
+        return jsonify({"error": "Batch size exceeds admission limits", "limits": dict(admissionConfig)}), 400
+
+    queueDepth = jobQueue.qsize()
+    clientInFlight = len(clientJobs.get(clientId, []))
+    queueExcess = queueDepth + numJobs - admissionConfig["maxQueueDepth"]
+    clientExcess = clientInFlight + numJobs - admissionConfig["maxClientJobs"]
+    if queueExcess <= 0 and clientExcess <= 0:
+        return None
+
+    # estimate how long until enough jobs finish to make room
+    retryAfter = 0
+    if queueExcess > 0:     # jobs leave the queue when they start
+        retryAfter = runningRemaining() + (queueExcess - 1) * workerTime(defaultConfig["delay"])
+    if clientExcess > 0:    # client jobs only free a slot once they finish
+        finishTimes = sorted(expectedFinish(job) for job in clientJobs[clientId])
+        retryAfter = max(retryAfter, finishTimes[clientExcess - 1])
+    retryAfter = max(1, math.ceil(retryAfter))
+
+    serverError(f"Rejected {numJobs} jobs for client {clientId}: queue {queueDepth}/{admissionConfig['maxQueueDepth']}, "
+                f"client {clientInFlight}/{admissionConfig['maxClientJobs']}, retry after {retryAfter}s")
+    response = jsonify({"error": "Server busy, retry later", "retryAfter": retryAfter,
+                        "queueDepth": queueDepth, "clientInFlight": clientInFlight})
+    response.headers["Retry-After"] = str(retryAfter)
+    return response, 429
+
+# puts a job at the back of the queue and numbers it so its position is known without scanning (call with lock held)
+def enqueue(job):
+    global enqueuedCount
+    job.seq = enqueuedCount
+    enqueuedCount += 1
+    jobQueue.put(job.jobId)
+
+# number of jobs ahead of a queued job
+def queuePosition(job):
+    if job.seq is None:
+        return 0
+    return max(0, job.seq - dequeuedCount)
+
+# seconds between the worker's progress checks on a job
+def workerPollRate(delay):
+    return max(1, delay * 0.1) # Polling rate is 10% of delay
+
+# seconds from a job starting until the worker's progress check marks it completed
+def completionTime(delay):
+    pollRate = workerPollRate(delay)
+    return math.ceil(delay / pollRate - 1e-9) * pollRate
+
+# seconds the worker spends on a job, it sleeps once more after the last check before taking the next one
+def workerTime(delay):
+    return completionTime(delay) + workerPollRate(delay)
+
+# seconds until the worker is free to take the next queued job
+def runningRemaining():
+    job = jobs.get(currJobId) if currJobId else None
+    if not job or not job.startTime:
+        return 0
+    return max(0, job.startTime + workerTime(job.delay) - time.time())
+
+# estimated seconds until a job finishes, based on its place in the queue and the remaining delay
+def expectedFinish(job):
+    if job.status == "running":
+        return max(0, job.startTime + completionTime(job.delay) - time.time())
+    if job.status == "queued":
+        return runningRemaining() + queuePosition(job) * workerTime(defaultConfig["delay"]) + completionTime(job.delay)
+    return 0
+
+# seconds the client should wait before polling these jobs again (0 if nothing is pending)
+def pollAfter(jobList):
+    pending = [expectedFinish(job) for job in jobList if job.status in ["queued", "running"]]
+    if not pending:
+        return 0
+    return min(maxPollAfter, max(1, math.ceil(min(pending))))
+
+# adds the X-Poll-After hint to a status response
+def withPollHint(response, jobList):
+    response.headers["X-Poll-After"] = str(pollAfter(jobList))
+    return response
+
 # cancel a job
 def cancelJob(jobId):
     with lock:
@@ -131,22 +278,25 @@ def getStatus(jobId=None, clientId=None):
         serverLog(f"GetStatus: Received a request to /status/{jobId}")
         if jobId not in jobs:
             serverError(f"GetStatus: Job ID {jobId} not found")
-            return jsonify({"status": "error", "message": f"Job ID {jobId} not found"}), 404
-        return jsonify(jobs[jobId].toDict())
+            return withPollHint(jsonify({"status": "error", "message": f"Job ID {jobId} not found"}), []), 404  # 0, nothing to poll
+        return withPollHint(jsonify(jobs[jobId].toDict()), [jobs[jobId]])
     
     # To output all jobs of a client
     if clientId:
         serverLog(f"GetStatus: Received a request for all jobs of client {clientId}")
         if clientId not in clientJobs:
-            return jsonify({"status": "error", "message": f"No jobs found for client {clientId}"}), 404
-        return jsonify([job.toDict() for job in clientJobs[clientId]])
+            return withPollHint(jsonify({"status": "error", "message": f"No jobs found for client {clientId}"}), []), 404
+        return withPollHint(jsonify([job.toDict() for job in clientJobs[clientId]]), clientJobs[clientId])
 
+    # only unfinished jobs so the cost follows the queue, not every job ever created (see /completed for the rest)
     serverLog("GetStatus: Received a request to /status")
-    return jsonify({jobId: job.toDict() for jobId, job in jobs.items()})
+    with lock:
+        unfinished = [job for clientList in clientJobs.values() for job in clientList]
+    return withPollHint(jsonify({job.jobId: job.toDict() for job in unfinished}), unfinished)
 
 # resets either the entire server or a specific job
 def reset(jobId=None):
-    global jobQueue, jobs, currJobId, defaultConfig
+    global jobQueue, jobs, currJobId, defaultConfig, dequeuedCount
     with lock:
         if jobId:
             serverLog(f"RESET: Received a request to /reset/{jobId}")
@@ -159,7 +309,7 @@ def reset(jobId=None):
                 currJobId = None
             
             job.reset()
-            jobQueue.put(jobId)  # push back to back of queue
+            enqueue(job)  # push back to back of queue
             serverLog(f"RESET: Job {jobId} reset successfully")
             return jsonify(job.toDict())
 
@@ -170,6 +320,7 @@ def reset(jobId=None):
         # Clear all jobs and reset global variables
         while not jobQueue.empty():
             jobQueue.get()
+        dequeuedCount = enqueuedCount  # queue is empty, so nothing is ahead of the next job
         jobs.clear()
         clientJobs.clear()
     return jsonify({"message": "Server reset successfully",})
@@ -190,6 +341,23 @@ def setServerParams(delay, errorRate):
         serverError(f"Invalid parameters: {e}")
         return jsonify({"error": "Invalid parameters", "details": str(e)}), 400
 
+# sets the admission limits for queue depth and unfinished jobs per client
+def setServerLimits(maxQueueDepth, maxClientJobs):
+    try:
+        maxQueueDepth = int(maxQueueDepth)
+        maxClientJobs = int(maxClientJobs)
+        if maxQueueDepth <= 0 or maxClientJobs <= 0:
+            raise ValueError("Invalid maxQueueDepth or maxClientJobs values")
+
+        with lock:
+            admissionConfig["maxQueueDepth"] = maxQueueDepth
+            admissionConfig["maxClientJobs"] = maxClientJobs
+        serverLog(f"Server limits updated: maxQueueDepth={maxQueueDepth}, maxClientJobs={maxClientJobs}")
+        return jsonify({"message": "Server limits updated successfully", "maxQueueDepth": maxQueueDepth, "maxClientJobs": maxClientJobs})
+    except (TypeError, ValueError) as e:
+        serverError(f"Invalid limits: {e}")
+        return jsonify({"error": "Invalid limits", "details": str(e)}), 400
+
 # -------------------------------------- Routes -------------------------------------- #
 
 # routes that require locks and global vars
@@ -213,10 +381,21 @@ jobRoutes = Blueprint("jobRoutes", __name__)
 @jobRoutes.route("/create_job/<clientId>", methods=["POST"])
 def createJobRoute(clientId):
     serverLog(f"Received request to create job for client {clientId}")
-    callbackUrl = f"http://localhost:5002/callback/{clientId}"
+    callbackUrl = f"{callbackBaseUrl}/callback/{clientId}"
     jobId = request.args.get("jobId", None)  #gets name of job if set
     return createJob(clientId, jobId, callbackUrl)
 
+@jobRoutes.route("/create_jobs/<clientId>", methods=["POST"])
+def createJobsRoute(clientId):
+    callbackUrl = f"{callbackBaseUrl}/callback/{clientId}"
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        serverError(f"Create jobs for client {clientId}: request body must be a JSON object")
+        return jsonify({"error": "Request body must be a JSON object with a jobIds list"}), 400
+    jobIds = data.get("jobIds")  # list of job names, null entries get a random ID
+    serverLog(f"Received request to create {len(jobIds) if isinstance(jobIds, list) else 0} jobs for client {clientId}")
+    return createJobs(clientId, jobIds, callbackUrl)
+
 @jobRoutes.route("/cancel/<jobId>", methods=["POST"])
 def cancelJobRoute(jobId):
     return cancelJob(jobId)
@@ -237,6 +416,12 @@ def setParamsRoute():
     errorRate = request.args.get("errorRate")
     return setServerParams(delay, errorRate)
 
+@mgmtRoutes.route("/set_limits", methods=["POST"])
+def setLimitsRoute():
+    maxQueueDepth = request.args.get("maxQueueDepth", admissionConfig["maxQueueDepth"])
+    maxClientJobs = request.args.get("maxClientJobs", admissionConfig["maxClientJobs"])
+    return setServerLimits(maxQueueDepth, maxClientJobs)
+
 statusRoutes = Blueprint("statusRoutes", __name__)
 
 @statusRoutes.route("/status", methods=["GET"])
@@ -11,12 +11,16 @@ usage() {
   echo "  get_clients                           | Get all clients"
   echo "  create_client [name]                  | Create new client (default: test)"
   echo "  create_job <client> [jobID]           | Create new job for client (default:test)"
+  echo "  create_jobs <client> [count]          | Create many jobs for client in bulk (default: 10)"
   echo "  cancel_job <jobID>                    | Cancel job"
   echo "  get_job_status <jobID>                | Get status of job"
   echo "  get_client_status <clientID>          | Get status of client"
   echo "  get_completed                         | Get all completed jobs"
   echo "  get_client_completed <clientID>       | Get all completed jobs for client"
   echo "  test                                  | Run integration test"
+  echo "  bench                                 | Benchmark bulk vs one-by-one job submission"
+  echo "  load_test                             | Run admission control and polling load test"
+  echo "  set_limits <maxQueueDepth> <maxClientJobs> | Set admission limits"
   exit 1
 }
 
@@ -135,6 +139,19 @@ create_job() {
   fi
 }
 
+create_jobs() {
+  local client_id="$1"
+  local count="${2:-10}"
+
+  if [ -z "$client_id" ]; then
+    echo "Client ID required"
+    return 1
+  fi
+
+  echo "Creating $count jobs for client: $client_id"
+  curl -X POST "http://localhost:$CLIENT_PORT/create_jobs/$client_id?count=$count"
+}
+
 cancel_job() {
   local job_id="$1"
   if [ -z "$job_id" ]; then
@@ -187,6 +204,25 @@ test() {
   
 }
 
+load_test() {
+  echo "Running backpressure load test"
+  python3 testing/backpressure_load_test.py
+}
+
+set_limits() {
+  if [ -z "$1" ] || [ -z "$2" ]; then
+    echo "maxQueueDepth and maxClientJobs required"
+    return 1
+  fi
+  echo "Setting limits: maxQueueDepth=$1, maxClientJobs=$2"
+  curl -X POST "http://localhost:$SERVER_PORT/set_limits?maxQueueDepth=$1&maxClientJobs=$2"
+}
+
+bench() {
+  echo "Running job submission benchmark"
+  python3 testing/bulk_submit_bench.py
+}
+
 case $1 in
   start)
     start_server
@@ -210,6 +246,9 @@ case $1 in
   create_job)
     create_job "$2" "$3"
     ;;
+  create_jobs)
+    create_jobs "$2" "$3"
+    ;;
   simple_test)
     start_server
     start_client
@@ -219,6 +258,15 @@ case $1 in
     create_job
     status
     ;;
+  bench)
+    bench
+    ;;
+  load_test)
+    load_test
+    ;;
+  set_limits)
+    set_limits "$2" "$3"
+    ;;
   test)
     test
     ;;
@@ -0,0 +1,136 @@
+import logging
+import os
+import sys
+import time
+
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from bulk_submit_bench import CountingClient, startServer
+
+NUM_CLIENTS = 5
+FLOOD_JOBS = 2000           # jobs each client tries to submit during the overload phase
+STATUS_SAMPLES = 50
+POLL_JOBS = 5
+POLL_DELAY = 5              # seconds per job while comparing polling strategies
+QUEUE_DEPTHS = [10, 5000, 15000]
+
+# times GET /status/<jobId> for the last job in the queue at different queue depths
+def statusCost(server):
+    main.admissionConfig.update(maxQueueDepth=max(QUEUE_DEPTHS), maxClientJobs=max(QUEUE_DEPTHS))
+    for depth in QUEUE_DEPTHS:
+        main.reset()
+        for start in range(0, depth, main.maxBatchSize):
+            response = server.post("/create_jobs/depth", json={"jobIds": [None] * min(main.maxBatchSize, depth - start)})
+        lastJobId = response.get_json()[-1]["jobId"]
+        startTime = time.perf_counter()
+        for _ in range(STATUS_SAMPLES):
+            response = server.get(f"/status/{lastJobId}")
+        perCall = (time.perf_counter() - startTime) / STATUS_SAMPLES * 1000
+        print(f"  depth {depth:>5}: {perCall:.2f}ms per call, X-Poll-After {response.headers['X-Poll-After']}s")
+
+# floods the server with submissions and times /status afterwards, with and without admission limits
+def overload(server, limits):
+    main.reset()
+    main.admissionConfig.update(limits)
+    accepted = rejected = 0
+    retryAfters = []
+    for i in range(NUM_CLIENTS):
+        for _ in range(FLOOD_JOBS // 100):
+            response = server.post(f"/create_jobs/flood_{i}", json={"jobIds": [None] * 100})
+            if response.status_code == 429:
+                rejected += 100
+                retryAfters.append(int(response.headers["Retry-After"]))
+            else:
+                accepted += 100
+
+    latencies = []
+    for _ in range(STATUS_SAMPLES):
+        startTime = time.perf_counter()
+        server.get("/status")
+        latencies.append(time.perf_counter() - startTime)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    retryInfo = f", Retry-After {min(retryAfters)}-{max(retryAfters)}s" if retryAfters else ""
+    print(f"  limits {limits}: accepted {accepted}, rejected {rejected}{retryInfo}, /status p95 {p95:.1f}ms")
+
+# VideoTransClient over HTTP: an oversized batch is shrunk to the server's limits and 429s are waited out
+def checkClientBackpressure():
+    main.reset()
+    main.admissionConfig.update(maxQueueDepth=1000, maxClientJobs=3)
+    library = CountingClient(startServer(main.app), None, clientId="backpressure", maxTimeout=30)
+    startTime = time.time()
+    result = library.createJobs(4)
+    assert result["result"] == "success" and len(result["jobIds"]) == 4, result
+    assert library.batchSize == 3 and library.sentBatches[:3] == [4, 3, 1], library.sentBatches
+    print(f"  batches sent {library.sentBatches}, all 4 jobs created after {time.time() - startTime:.1f}s of backoff")
+
+# VideoTransClient that counts its status calls, optionally ignoring the server's X-Poll-After hint
+class PollingClient(CountingClient):
+    def __init__(self, *args, useHint=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.useHint = useHint
+        self.statusCalls = 0
+        self.pendingCalls = 0   # calls that only found the job still pending
+
+    def getStatus(self, jobId=None):
+        result = super().getStatus(jobId)
+        self.statusCalls += 1
+        if result.get("data", {}).get("status") == "Pending":
+            self.pendingCalls += 1
+        if not self.useHint:
+            result.pop("pollAfter", None)   # falls back to pollingInterval
+        return result
+
+# accepts job updates the way the callback server would, so the worker isn't stuck retrying notifications
+def startCallbackStub():
+    stub = Flask(__name__)
+
+    @stub.route("/callback/<clientId>", methods=["POST"])
+    def callback(clientId):
+        return jsonify({"result": "success"})
+
+    return startServer(stub)
+
+# waits for every job with VideoTransClient.waitForAll, at the default pollingInterval or following X-Poll-After
+def pollUntilDone(serverUrl, useHint):
+    main.reset()
+    library = PollingClient(serverUrl, None, clientId="poller", useHint=useHint)
+    library.createJobs(POLL_JOBS)
+    startTime = time.time()
+    result = library.waitForAll()
+    assert all(jobResult["result"] == "completed" for jobResult in result["data"].values()), result
+    mode = "X-Poll-After" if useHint else f"fixed {library.pollingInterval}s"
+    print(f"  {mode:>12}: {library.statusCalls} status calls ({library.pendingCalls} still pending) "
+          f"for {POLL_JOBS} jobs in {time.time() - startTime:.1f}s")
+    return library.pendingCalls
+
+def runLoadTest():
+    logging.disable(logging.CRITICAL)   # per-request log lines would dominate the timing
+    main.defaultConfig.update(delay=1, errorRate=0)
+    main.callbackBaseUrl = startCallbackStub()
+    server = main.app.test_client()
+    with main.app.app_context():
+        print("Status cost by queue depth")
+        statusCost(server)
+
+        print("Overload: status latency with and without admission control")
+        overload(server, {"maxQueueDepth": NUM_CLIENTS * FLOOD_JOBS, "maxClientJobs": FLOOD_JOBS})
+        overload(server, {"maxQueueDepth": 1000, "maxClientJobs": 200})
+
+        print("Client backpressure: batch shrinking and Retry-After")
+        checkClientBackpressure()
+
+        print("Polling: VideoTransClient.waitForAll until all jobs finish")
+        main.admissionConfig.update(maxQueueDepth=1000, maxClientJobs=200)
+        main.defaultConfig.update(delay=POLL_DELAY)
+        serverUrl = startServer(main.app)
+        fixed = pollUntilDone(serverUrl, useHint=False)
+        hinted = pollUntilDone(serverUrl, useHint=True)
+    print(f"Wasted (still pending) status calls saved by X-Poll-After: {fixed - hinted} of {fixed}")
+
+
+if __name__ == "__main__":
+    runLoadTest()
@@ -0,0 +1,93 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main
+from client import VideoTransClient, client as proxyApp, get_clients
+
+NUM_JOBS = 10000
+BATCH_SIZE = 500
+LOG_FILE = os.path.join(ROOT, "logs", "bench.log")
+
+# records the size of every batch the library sends so chunking can be checked
+class CountingClient(VideoTransClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sentBatches = []
+
+    def send(self, method, url, **kwargs):
+        self.sentBatches.append(len(kwargs.get("json", {}).get("jobIds", [])))
+        return super().send(method, url, **kwargs)
+
+# serves a flask app over HTTP on a free port and returns its base url
+def startServer(app):
+    server = make_server("localhost", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://localhost:{server.server_port}"
+
+# keeps logging on (it is part of the per-job cost) but sends it to a file instead of the terminal
+def logToFile():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.FileHandler(LOG_FILE, mode="w")
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    root.addHandler(handler)
+
+# runs VideoTransClient.createJobs against the real server to check chunking and partial failures
+def checkClientLibrary(serverUrl):
+    main.reset()
+    library = CountingClient(serverUrl, None, clientId="bench_check", batchSize=3)
+    result = library.createJobs(7)
+    assert result["result"] == "success" and len(result["jobIds"]) == 7, result
+    assert library.sentBatches == [3, 3, 1], library.sentBatches
+
+    # second chunk hits an existing job ID, the first chunk's jobs are still reported
+    library = CountingClient(serverUrl, None, clientId="bench_check", batchSize=2)
+    result = library.createJobs(["a", "b", "c", result["jobIds"][0]])
+    assert result["result"] == "error" and result["jobIds"] == ["a", "b"], result
+    assert library.sentBatches == [2, 2], library.sentBatches
+    print("Client library: chunking and partial failure OK")
+
+# compares submitting jobs one at a time against the bulk /create_jobs endpoint through the client proxy
+def submitOneByOne(proxyUrl, clientId):
+    for _ in range(NUM_JOBS):
+        requests.post(f"{proxyUrl}/create_job/{clientId}").raise_for_status()
+
+def submitBulk(proxyUrl, clientId):
+    requests.post(f"{proxyUrl}/create_jobs/{clientId}?count={NUM_JOBS}").raise_for_status()
+
+def timeSubmission(name, submit, serverUrl, proxyUrl):
+    main.reset()
+    clientId = f"bench_{name}"
+    get_clients()[clientId] = VideoTransClient(serverUrl, None, clientId=clientId, batchSize=BATCH_SIZE)
+    startTime = time.perf_counter()
+    submit(proxyUrl, clientId)
+    elapsed = time.perf_counter() - startTime
+    assert len(main.jobs) == NUM_JOBS, len(main.jobs)
+    print(f"{name:>12}: {NUM_JOBS} jobs in {elapsed:.2f}s ({NUM_JOBS / elapsed:,.0f} jobs/s)")
+    return elapsed
+
+def runBench():
+    logToFile()
+    main.admissionConfig.update(maxQueueDepth=2 * NUM_JOBS, maxClientJobs=NUM_JOBS)  # measure throughput, not admission control
+    serverUrl = startServer(main.app)
+    proxyUrl = startServer(proxyApp)
+    with main.app.app_context():
+        checkClientLibrary(serverUrl)
+        print(f"Submitting through the client proxy over HTTP (logging on, written to {os.path.relpath(LOG_FILE, ROOT)})")
+        single = timeSubmission("one-by-one", submitOneByOne, serverUrl, proxyUrl)
+        bulk = timeSubmission("bulk", submitBulk, serverUrl, proxyUrl)
+    print(f"Bulk submission speedup: {single / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    runBench()